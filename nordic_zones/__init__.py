@@ -0,0 +1,4 @@
+from .io import load
+from .detect import detect_anchors
+from .zones import build_zones, palette
+from .plot import hr_chart, render_png
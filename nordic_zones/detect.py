@@ -0,0 +1,8 @@
+import numpy as np
+
+def detect_anchors(hr: np.ndarray) -> tuple[int, int]:
+    # LTHR = first lap whose HR rise is positive but under half the previous rise, else 90 % of max
+    max_hr=int(hr.max()); d=np.diff(hr)
+    mask=(d[1:]>0)&(d[:-1]>0)&(d[1:]<0.5*d[:-1])  # mask[k] compares the rises into laps k+1 and k+2
+    thr=int(hr[mask.argmax()+2]) if mask.any() else int(0.9*max_hr)
+    return thr, max_hr
@@ -0,0 +1,27 @@
+import streamlit as st, pandas as pd
+from io import BytesIO
+
+CSV_DTYPES = {'Lap':'Int16','HR':'Float32','Time':'string'}
+REQUIRED = pd.Index(['Lap','Time','HR'])
+
+def _read_csv(data: bytes, sep: str, engine: str = 'c') -> pd.DataFrame:
+    if engine=='pyarrow':
+        try:
+            import pyarrow as pa, pyarrow.csv as pac
+            # typed while parsing, then mapped onto the same extension dtypes the C path yields
+            types={'Lap':pa.int16(),'HR':pa.float32(),'Time':pa.string()}
+            dtypes={pa.int16():pd.Int16Dtype(),pa.float32():pd.Float32Dtype(),pa.string():pd.StringDtype()}
+            t=pac.read_csv(BytesIO(data), parse_options=pac.ParseOptions(delimiter=sep), convert_options=pac.ConvertOptions(column_types=types))
+            return t.to_pandas(types_mapper=dtypes.get)
+        except (ImportError, ValueError): pass  # no pyarrow, or input it rejects: let the C parser have a go
+    return pd.read_csv(BytesIO(data), sep=sep, dtype=CSV_DTYPES)
+
+@st.cache_data
+def load(data: bytes, sep: str, engine: str = 'c') -> pd.DataFrame | None:
+    df=_read_csv(data, sep, engine)
+    if len(REQUIRED.difference(df.columns)): return None  # reported by the caller
+    if 'Time_sec' not in df.columns:
+        s=df['Time'].astype(str); s=s.where(s.str.count(':')>=2,'00:'+s)
+        df['Time_sec']=pd.to_timedelta(s).dt.total_seconds().astype('float32')
+    if df['Lap'].is_monotonic_increasing: return df  # the usual case: laps typed in order
+    return df.sort_values('Lap', kind='stable').reset_index(drop=True)
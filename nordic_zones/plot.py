@@ -0,0 +1,31 @@
+import streamlit as st, pandas as pd, numpy as np, altair as alt
+from io import BytesIO
+from .zones import palette
+
+def hr_chart(hr: pd.DataFrame, zone_df: pd.DataFrame, ylim: list) -> alt.LayerChart:
+    bands=alt.Chart(zone_df).mark_rect(opacity=0.25).encode(
+        y=alt.Y('Low bpm:Q',title='HR (bpm)',scale=alt.Scale(domain=ylim,nice=False)), y2='High bpm:Q',
+        color=alt.Color('Zone:N',scale=alt.Scale(domain=list(palette),range=list(palette.values())),legend=None))
+    line=alt.Chart(hr).mark_line(point=alt.OverlayMarkDef(color='black',size=40),color='black').encode(x=alt.X('Lap:O',axis=alt.Axis(labelAngle=0)),y='HR:Q')
+    chart=bands+line
+    if len(hr)<=30: chart+=alt.Chart(hr).mark_text(dy=-8,fontSize=8).encode(x='Lap:O',y='HR:Q',text=alt.Text('HR:Q',format='d'))
+    return chart.properties(height=320)
+
+@st.cache_data
+def render_png(laps: bytes, hrs: bytes, zones: tuple, ylim: tuple) -> bytes:  # int32/float32 buffers hash in one pass, unlike a DataFrame
+    # matplotlib loads on the first download only; a bare Figure needs neither pyplot nor a GUI backend
+    from matplotlib.figure import Figure
+    from matplotlib.collections import PolyCollection
+    fig=Figure(figsize=(7,4)); ax=fig.subplots()
+    verts=[[(0,lo),(1,lo),(1,hi),(0,hi)] for lo,hi in zones]
+    ax.add_collection(PolyCollection(verts,facecolors=list(palette.values()),alpha=0.25,transform=ax.get_yaxis_transform()),autolim=False)
+    xs,ys=np.frombuffer(laps,dtype=np.int32),np.frombuffer(hrs,dtype=np.float32)
+    ax.plot(xs,ys,marker='o',color='black')
+    # per-lap labels only stay readable (and cheap) for test-sized inputs
+    if len(xs)<=30:
+        for x,y,l in zip(xs,ys+1,np.char.mod('%d',ys)): ax.text(x,y,l,ha='center',fontsize=8,parse_math=False)
+    ax.set_xlabel('Lap'); ax.set_ylabel('HR (bpm)')
+    ax.set_ylim(*ylim); ax.set_xticks(xs); ax.grid(alpha=0.3)
+    fig.tight_layout()  # one layout pass instead of bbox_inches='tight' re-drawing the whole figure to measure it
+    buf=BytesIO(); fig.savefig(buf, format='png', dpi=150)
+    return buf.getvalue()
@@ -0,0 +1,14 @@
+import streamlit as st, pandas as pd, numpy as np
+
+# (low, high) multipliers per zone Z1..Z5
+LTHR_MULTS = np.array([[0,0.85],[0.85,0.89],[0.89,0.94],[0.94,1.0],[1.0,1.15]])
+MAX_MULTS = np.array([[0.55,0.70],[0.70,0.80],[0.80,0.87],[0.87,0.92],[0.92,1.0]])
+palette = {'Z1':'#8ecae6','Z2':'#94d2bd','Z3':'#ffd166','Z4':'#f8961e','Z5':'#ef476f'}
+
+def zones_lthr(t,m): b=LTHR_MULTS*t; b[4,1]=max(b[4,1],m); return b
+def zones_max(m): return MAX_MULTS*m
+
+@st.cache_data
+def build_zones(model: str, thr: int, max_hr: int) -> tuple[np.ndarray, pd.DataFrame]:
+    zones = zones_lthr(thr,max_hr) if model.startswith('% LTHR') else zones_max(max_hr)
+    return zones, pd.DataFrame({'Zone':list(palette),'Low bpm':zones[:,0].astype(int),'High bpm':zones[:,1].astype(int)})